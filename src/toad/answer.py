@@ -1,4 +1,5 @@
-from typing import Literal, NamedTuple
+from dataclasses import dataclass
+from typing import Literal
 
 
 """
@@ -9,7 +10,8 @@ reject_always - Reject this operation and remember the choice
 """
 
 
-class Answer(NamedTuple):
+@dataclass(slots=True, frozen=True)
+class Answer:
     """An answer to a question posed by the agent."""
 
     text: str
@@ -20,7 +20,7 @@ from textual.notifications import Notify
 import toad
 from toad.settings import Schema, Settings
 from toad.agent_schema import Agent as AgentData
-from toad.settings_schema import SCHEMA
+from toad.settings_schema import COMPILED_SCHEMA
 from toad.version import VersionMeta
 from toad import paths
 from toad import atomic
@@ -280,7 +280,7 @@ class ToadApp(App, inherit_bindings=False):
 
     @cached_property
     def settings_schema(self) -> Schema:
-        return Schema(SCHEMA)
+        return COMPILED_SCHEMA
 
     @cached_property
     def version(self) -> str:
@@ -1,18 +1,25 @@
 from __future__ import annotations
 
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable
+
 from textual import on
 from textual.app import ComposeResult
 from textual import lazy
 from textual import containers
 from textual.content import Content
+from textual.message import Message
 from textual.screen import ModalScreen, ScreenResultType
+from textual.timer import Timer
 from textual.widgets import Input, Select, Checkbox, Footer, Static, TextArea
 from textual.compose import compose
 from textual.validation import Validator, Number
+from textual.widget import Widget
 from textual import getters
 
 
-from toad.settings import Setting
+from toad.settings import Schema, Setting, SettingType
 from toad.app import ToadApp
 
 
@@ -20,6 +27,197 @@ class SettingsInput(Input):
     pass
 
 
+@dataclass(frozen=True)
+class SettingBlueprint:
+    """The parts of a setting's widgets that depend only on the schema."""
+
+    setting: Setting
+    """The setting."""
+    name: str
+    """Name used when searching settings."""
+    help: Content = field(default_factory=Content)
+    """Help text (including the default for inputs)."""
+    validators: tuple[Validator, ...] = ()
+    """Validators for numeric inputs."""
+    choices: list[tuple[str, str]] = field(default_factory=list)
+    """Choices as (label, value) tuples."""
+    choice_values: frozenset[str] = frozenset()
+    """The set of values in choices."""
+    children: list[SettingBlueprint] = field(default_factory=list)
+    """Blueprints for child settings (objects only)."""
+
+
+def get_setting_help(schema: Schema, setting: Setting) -> Content:
+    """Get the help for a setting, which includes its default.
+
+    Args:
+        schema: Settings schema.
+        setting: A setting (not an object).
+
+    Returns:
+        Help content.
+    """
+    default = schema.get_default(setting.key)
+    if setting.type == SettingType.TEXT or default is None:
+        return Content.from_markup(setting.help)
+    if setting.type == SettingType.CHOICES:
+        # For choices we need to translate the default to its associated label
+        for choice in setting.choices or []:
+            if isinstance(choice, tuple):
+                title, choice_value = choice
+            else:
+                title = choice_value = choice
+            if default == choice_value:
+                default = title
+    if setting.help:
+        return Content.assemble(
+            Content.from_markup(setting.help),
+            (f"\ndefault: {default!r}", "$text-secondary"),
+        )
+    return Content.styled(f"default: {default!r}", "$text-secondary")
+
+
+def get_setting_blueprint(
+    schema: Schema, group_title: str, setting: Setting
+) -> SettingBlueprint:
+    """Build the blueprint for a single setting.
+
+    Args:
+        schema: Settings schema.
+        group_title: Title of the containing group.
+        setting: The setting.
+
+    Returns:
+        A blueprint.
+    """
+    name = f"{group_title.lower()} {setting.title.lower()}"
+    if setting.type == SettingType.OBJECT:
+        return SettingBlueprint(setting, name, help=Content.from_markup(setting.help))
+    validators: list[Validator] = []
+    for validate in setting.validate or []:
+        validate_type = validate["type"]
+        if validate_type == "minimum":
+            validators.append(Number(minimum=validate["value"]))
+        elif validate_type == "maximum":
+            validators.append(Number(maximum=validate["value"]))
+    choices = [
+        choice if isinstance(choice, tuple) else (choice, choice)
+        for choice in setting.choices or []
+    ]
+    return SettingBlueprint(
+        setting,
+        name,
+        help=get_setting_help(schema, setting),
+        validators=tuple(validators),
+        choices=choices,
+        choice_values=frozenset(value for _title, value in choices),
+    )
+
+
+@lru_cache(maxsize=4)
+def get_blueprints(schema: Schema) -> list[SettingBlueprint]:
+    """Get blueprints for the settings screen, which are built once per schema.
+
+    Args:
+        schema: Settings schema.
+
+    Returns:
+        Blueprints for the top level (editable) settings.
+    """
+    blueprints: list[SettingBlueprint] = []
+    stack: list[tuple[list[SettingBlueprint], str, dict[str, Setting]]] = [
+        (blueprints, "", schema.settings_map)
+    ]
+    while stack:
+        group, group_title, settings_map = stack.pop()
+        for setting in settings_map.values():
+            if not setting.editable:
+                continue
+            if setting.type == SettingType.OBJECT and setting.children is None:
+                continue
+            blueprint = get_setting_blueprint(schema, group_title, setting)
+            group.append(blueprint)
+            if setting.children is not None:
+                stack.append((blueprint.children, setting.title, setting.children))
+    return blueprints
+
+
+def build_string_input(blueprint: SettingBlueprint, value: object) -> Widget:
+    return Input(str(value), classes="input", name=blueprint.setting.key)
+
+
+def build_text_input(blueprint: SettingBlueprint, value: object) -> Widget:
+    return TextArea(str(value), classes="input", name=blueprint.setting.key)
+
+
+def build_boolean_input(blueprint: SettingBlueprint, value: object) -> Widget:
+    return Checkbox(value=bool(value), classes="input", name=blueprint.setting.key)
+
+
+def build_integer_input(blueprint: SettingBlueprint, value: object) -> Widget:
+    setting = blueprint.setting
+    try:
+        integer_value = int(value)
+    except (ValueError, TypeError):
+        integer_value = setting.default
+    return Input(
+        str(integer_value),
+        type="integer",
+        classes="input",
+        name=setting.key,
+        validators=list(blueprint.validators),
+    )
+
+
+def build_number_input(blueprint: SettingBlueprint, value: object) -> Widget:
+    setting = blueprint.setting
+    try:
+        number_value = float(value)
+    except (ValueError, TypeError):
+        number_value = setting.default
+    return Input(
+        str(number_value),
+        type="number",
+        classes="input",
+        name=setting.key,
+        validators=list(blueprint.validators),
+    )
+
+
+def build_choices_input(blueprint: SettingBlueprint, value: object) -> Widget:
+    setting = blueprint.setting
+    select_value = str(value)
+    return Select(
+        blueprint.choices,
+        value=(
+            select_value if select_value in blueprint.choice_values else setting.default
+        ),
+        classes="input",
+        name=setting.key,
+        allow_blank=setting.default is None,
+    )
+
+
+INPUT_BUILDERS: dict[SettingType, Callable[[SettingBlueprint, object], Widget]] = {
+    SettingType.STRING: build_string_input,
+    SettingType.TEXT: build_text_input,
+    SettingType.BOOLEAN: build_boolean_input,
+    SettingType.INTEGER: build_integer_input,
+    SettingType.NUMBER: build_number_input,
+    SettingType.CHOICES: build_choices_input,
+}
+"""Maps a setting type on to a function that builds its input widget."""
+
+PREVENT_MESSAGES: dict[SettingType, tuple[type[Message], ...]] = {
+    SettingType.STRING: (Input.Changed,),
+    SettingType.BOOLEAN: (Checkbox.Changed,),
+    SettingType.INTEGER: (Input.Changed,),
+    SettingType.NUMBER: (Input.Changed,),
+    SettingType.CHOICES: (Select.Changed,),
+}
+"""Messages to prevent while building a setting's input widget."""
+
+
 class SettingsScreen(ModalScreen):
     BINDINGS = [
         ("escape", "dismiss", "Dismiss settings"),
@@ -33,154 +231,87 @@ class SettingsScreen(ModalScreen):
 
     AUTO_FOCUS = "Input#search"
 
+    SETTINGS_UPDATE_DELAY = 0.05
+    """Delay (in seconds) used to batch setting changes."""
+
+    def __init__(
+        self,
+        name: str | None = None,
+        id: str | None = None,
+        classes: str | None = None,
+    ) -> None:
+        self._pending_settings: dict[str, object] = {}
+        self._pending_settings_timer: Timer | None = None
+        super().__init__(name=name, id=id, classes=classes)
+
+    def queue_setting(self, key: str, value: object) -> None:
+        """Queue a setting change, so that bursts of changes are applied together.
+
+        Args:
+            key: Key in dot notation.
+            value: New value.
+        """
+        self._pending_settings[key] = value
+        if self._pending_settings_timer is None:
+            self._pending_settings_timer = self.set_timer(
+                self.SETTINGS_UPDATE_DELAY, self.flush_settings
+            )
+
+    def flush_settings(self) -> None:
+        """Apply any queued setting changes."""
+        if self._pending_settings_timer is not None:
+            self._pending_settings_timer.stop()
+            self._pending_settings_timer = None
+        pending_settings = self._pending_settings
+        self._pending_settings = {}
+        for key, value in pending_settings.items():
+            self.app.settings.set(key, value)
+
     def compose(self) -> ComposeResult:
-        settings = self.app.settings
-        schema = self.app.settings_schema
+        blueprints = get_blueprints(self.app.settings_schema)
+        # Bound once, as these are called for every setting
+        get_value = self.app.settings.get
+        get_input_builder = INPUT_BUILDERS.get
+        get_prevent_messages = PREVENT_MESSAGES.get
+
+        def heading(blueprint: SettingBlueprint) -> ComposeResult:
+            yield Static(blueprint.setting.title, classes="title")
+            if blueprint.help:
+                yield Static(blueprint.help, classes="help")
 
-        def schema_to_widget(
-            group_title: str, settings_map: dict[str, Setting]
+        def blueprints_to_widget(
+            blueprints: list[SettingBlueprint],
         ) -> ComposeResult:
-            for _key, setting in settings_map.items():
-                if not setting.editable:
-                    continue
-                if setting.type == "object":
-                    if setting.children is not None:
-                        with containers.VerticalGroup(classes="setting-object"):
-                            with containers.VerticalGroup(classes="heading"):
-                                yield Static(setting.title, classes="title")
-                                yield Static(setting.help, classes="help")
-                            with containers.VerticalGroup(
-                                id="setting-group", classes="setting-group"
-                            ):
-                                yield from compose(
-                                    self,
-                                    schema_to_widget(setting.title, setting.children),
-                                )
+            for blueprint in blueprints:
+                setting = blueprint.setting
+                if setting.type == SettingType.OBJECT:
+                    with containers.VerticalGroup(classes="setting-object"):
+                        with containers.VerticalGroup(classes="heading"):
+                            yield from heading(blueprint)
+                        with containers.VerticalGroup(
+                            id="setting-group", classes="setting-group"
+                        ):
+                            yield from compose(
+                                self, blueprints_to_widget(blueprint.children)
+                            )
 
                 else:
                     with containers.VerticalGroup(
-                        classes="setting",
-                        name=f"{group_title.lower()} {setting.title.lower()}",
+                        classes="setting", name=blueprint.name
                     ):
-                        value = settings.get(setting.key, object, expand=False)
-                        default = settings.schema.get_default(setting.key)
-
-                        if setting.type == "text" or default is None:
-                            help = Content.from_markup(setting.help)
-                        else:
-                            if setting.type == "choices":
-                                # For choices we need to translate the default to its associated label
-                                choices = setting.choices or []
-                                for choice in choices:
-                                    if isinstance(choice, tuple):
-                                        title, choice_value = choice
-                                    else:
-                                        title = choice_value = choice
-                                    if default == choice_value:
-                                        default = title
-                                else:
-                                    help = Content()
-
-                            if setting.help:
-                                help = Content.assemble(
-                                    Content.from_markup(setting.help),
-                                    (f"\ndefault: {default!r}", "$text-secondary"),
-                                )
-                            else:
-                                help = Content.styled(
-                                    f"default: {default!r}", "$text-secondary"
-                                )
-
-                        yield Static(setting.title, classes="title")
-                        if help:
-                            yield Static(help, classes="help")
-                        if setting.type == "string":
-                            with self.prevent(Input.Changed):
-                                yield Input(
-                                    str(value), classes="input", name=setting.key
-                                )
-                        if setting.type == "text":
-                            # with self.prevent(TextArea.Changed):
-                            yield TextArea(
-                                str(value), classes="input", name=setting.key
-                            )
-                        elif setting.type == "boolean":
-                            with self.prevent(Checkbox.Changed):
-                                yield Checkbox(
-                                    value=bool(value),
-                                    classes="input",
-                                    name=setting.key,
-                                )
-                        elif setting.type == "integer":
-                            try:
-                                integer_value = int(value)
-                            except (ValueError, TypeError):
-                                integer_value = setting.default
-                            setting_validate = setting.validate or []
-                            validators: list[Validator] = []
-                            for validate in setting_validate:
-                                validate_type = validate["type"]
-                                if validate_type == "minimum":
-                                    validators.append(Number(minimum=validate["value"]))
-                                elif validate_type == "maximum":
-                                    validators.append(Number(maximum=validate["value"]))
-                            with self.prevent(Input.Changed):
-                                yield Input(
-                                    str(integer_value),
-                                    type="integer",
-                                    classes="input",
-                                    name=setting.key,
-                                    validators=validators,
-                                )
-                        elif setting.type == "number":
-                            try:
-                                integer_value = float(value)
-                            except (ValueError, TypeError):
-                                integer_value = setting.default
-                            setting_validate = setting.validate or []
-                            validators: list[Validator] = []
-                            for validate in setting_validate:
-                                validate_type = validate["type"]
-                                if validate_type == "minimum":
-                                    validators.append(Number(minimum=validate["value"]))
-                                elif validate_type == "maximum":
-                                    validators.append(Number(maximum=validate["value"]))
-                            with self.prevent(Input.Changed):
-                                yield Input(
-                                    str(integer_value),
-                                    type="number",
-                                    classes="input",
-                                    name=setting.key,
-                                    validators=validators,
-                                )
-                        elif setting.type == "choices":
-                            select_value = str(value)
-                            choices = setting.choices or []
-                            with self.prevent(Select.Changed):
-                                select_choices = [
-                                    choice
-                                    if isinstance(choice, tuple)
-                                    else (choice, choice)
-                                    for choice in choices
-                                ]
-                                choices_set = {choice[1] for choice in select_choices}
-                                yield Select(
-                                    select_choices,
-                                    value=(
-                                        select_value
-                                        if select_value in choices_set
-                                        else setting.default
-                                    ),
-                                    classes="input",
-                                    name=setting.key,
-                                    allow_blank=setting.default is None,
-                                )
+                        value = get_value(setting.key, object, expand=False)
+                        yield from heading(blueprint)
+                        build_input = get_input_builder(setting.type)
+                        if build_input is not None:
+                            prevent = get_prevent_messages(setting.type, ())
+                            with self.prevent(*prevent):
+                                yield build_input(blueprint, value)
 
         with containers.Vertical(id="contents"):
             with containers.VerticalGroup(classes="search-container"):
                 yield Input(id="search", placeholder="Search settings")
             with lazy.Reveal(containers.VerticalScroll(can_focus=False)):
-                yield from compose(self, schema_to_widget("", schema.settings_map))
+                yield from compose(self, blueprints_to_widget(blueprints))
 
         yield Footer()
 
@@ -208,17 +339,17 @@ class SettingsScreen(ModalScreen):
     @on(TextArea.Changed)
     def on_text_area_changed(self, event: TextArea.Changed) -> None:
         if event.text_area.name is not None:
-            self.app.settings.set(event.text_area.name, event.text_area.text)
+            self.queue_setting(event.text_area.name, event.text_area.text)
 
     @on(Checkbox.Changed)
     def on_checkbox_changed(self, event: Checkbox.Changed) -> None:
         if event.checkbox.name is not None:
-            self.app.settings.set(event.checkbox.name, event.checkbox.value)
+            self.queue_setting(event.checkbox.name, event.checkbox.value)
 
     @on(Select.Changed)
     def on_select_changed(self, event: Select.Changed) -> None:
         if event.select.name is not None:
-            self.app.settings.set(event.select.name, event.select.value)
+            self.queue_setting(event.select.name, event.select.value)
 
     def filter_settings(self, search_term: str) -> None:
         if search_term:
@@ -246,5 +377,6 @@ class SettingsScreen(ModalScreen):
         return True
 
     async def action_dismiss(self, result: ScreenResultType | None = None) -> None:
+        self.flush_settings()
         self.query("#search").focus()
         self.call_after_refresh(self.dismiss, result)
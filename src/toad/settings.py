@@ -2,21 +2,39 @@ from __future__ import annotations
 
 from collections.abc import Mapping
 import copy
-from functools import cached_property
+from functools import cached_property, lru_cache
 from json import dumps
+from os.path import expandvars
 from dataclasses import dataclass
-from typing import Callable, Iterable, KeysView, Sequence, TypedDict, Required
+from enum import IntEnum
+from typing import Callable, KeysView, TypedDict, Required, cast
 
-from toad._loop import loop_last
 
+class SettingType(IntEnum):
+    """The type of a setting."""
 
-@dataclass
+    OBJECT = 0
+    STRING = 1
+    BOOLEAN = 2
+    INTEGER = 3
+    NUMBER = 4
+    CHOICES = 5
+    TEXT = 6
+
+
+SETTING_TYPES: Mapping[str, SettingType] = {
+    setting_type.name.lower(): setting_type for setting_type in SettingType
+}
+"""Maps the type in the schema on to a setting type."""
+
+
+@dataclass(slots=True, frozen=True)
 class Setting:
     """A setting or group of setting."""
 
     key: str
     title: str
-    type: str = "object"
+    type: SettingType = SettingType.OBJECT
     help: str = ""
     choices: list[str] | None = None
     default: object | None = None
@@ -42,7 +60,9 @@ class SchemaDict(TypedDict, total=False):
 type SettingsType = dict[str, object]
 
 
-INPUT_TYPES = {"boolean", "integer", "number", "string", "choices", "text"}
+INPUT_TYPES: frozenset[str] = frozenset(
+    {"boolean", "integer", "number", "string", "choices", "text"}
+)
 
 
 class SettingsError(Exception):
@@ -57,8 +77,9 @@ class InvalidValue(SettingsError):
     """The value was not of the expected type."""
 
 
-def parse_key(key: str) -> Sequence[str]:
-    return key.split(".")
+@lru_cache(maxsize=256)
+def parse_key(key: str) -> tuple[str, ...]:
+    return tuple(key.split("."))
 
 
 def get_setting[ExpectType](
@@ -78,8 +99,10 @@ def get_setting[ExpectType](
     Returns:
         The value matching they key.
     """
-    for last, key_component in loop_last(parse_key(key)):
-        if last:
+    key_components = parse_key(key)
+    last_index = len(key_components) - 1
+    for index, key_component in enumerate(key_components):
+        if index == last_index:
             result = settings[key_component]
             if not isinstance(result, expect_type):
                 raise InvalidValue(
@@ -87,28 +110,65 @@ def get_setting[ExpectType](
                 )
             return result
         else:
-            sub_settings = settings.setdefault(key_component, {})
-            assert isinstance(sub_settings, dict)
-            settings = sub_settings
+            settings = cast(SettingsType, settings.setdefault(key_component, {}))
     raise KeyError(key)
 
 
+def flatten_settings(settings: SettingsType) -> dict[str, object]:
+    """Flatten a nested settings structure.
+
+    Args:
+        settings: A settings dictionary.
+
+    Returns:
+        A dict that maps dotted keys (e.g. "ui.column") on to values.
+    """
+    flat: dict[str, object] = {}
+    stack: list[tuple[str, SettingsType]] = [("", settings)]
+    while stack:
+        prefix, node = stack.pop()
+        for key, value in node.items():
+            if isinstance(value, dict):
+                stack.append((f"{prefix}{key}.", value))
+            else:
+                flat[f"{prefix}{key}"] = value
+    return flat
+
+
 class Schema:
     def __init__(self, schema: list[SchemaDict]) -> None:
         self.schema = schema
 
+    def precompute(self) -> None:
+        """Build all cached data derived from the schema, so that first use is fast."""
+        _ = self.settings_map
+        _ = self.key_to_type
+        _ = self.valid_keys
+        _ = self._defaults_template
+
     def set_value(self, settings: SettingsType, key: str, value: object) -> None:
-        schema = self.schema
-        keys = parse_key(key)
-        for last, key in loop_last(keys):
-            if last:
-                settings[key] = value
-            if key not in schema:
-                raise InvalidKey()
-            schema = schema[key]
-            assert isinstance(schema, dict)
-            if key not in settings:
-                settings = settings[key] = {}
+        """Set a value in a settings structure.
+
+        Args:
+            settings: A settings dictionary.
+            key: Key in dot notation.
+            value: New value.
+
+        Raises:
+            InvalidKey: If the key is not in the schema.
+        """
+        if key not in self.valid_keys:
+            raise InvalidKey(key)
+        sub_keys = parse_key(key)
+        last_index = len(sub_keys) - 1
+        for index, sub_key in enumerate(sub_keys):
+            if index == last_index:
+                settings[sub_key] = value
+            else:
+                sub_settings = settings.get(sub_key)
+                if not isinstance(sub_settings, dict):
+                    sub_settings = settings[sub_key] = {}
+                settings = sub_settings
 
     def get_default(self, key: str) -> object | None:
         """Get a default for the given key.
@@ -119,11 +179,11 @@ class Schema:
         Returns:
             Default, or `None`.
         """
-        defaults = self.defaults
-
-        schema_object = defaults
-        for last, sub_key in loop_last(parse_key(key)):
-            if last:
+        schema_object = self._defaults_template
+        sub_keys = parse_key(key)
+        last_index = len(sub_keys) - 1
+        for index, sub_key in enumerate(sub_keys):
+            if index == last_index:
                 return schema_object.get(sub_key, None)
             else:
                 if isinstance(schema_object, dict):
@@ -132,53 +192,56 @@ class Schema:
                     return None
         return None
 
-    @cached_property
+    @property
     def defaults(self) -> dict[str, object]:
+        """A fresh copy of the default settings, safe to modify."""
+        return copy.deepcopy(self._defaults_template)
+
+    @cached_property
+    def _defaults_template(self) -> dict[str, object]:
+        """Default settings built from the schema (shared, don't modify)."""
         settings: dict[str, object] = {}
+        sub_settings: SettingsType
 
-        def set_defaults(schema: list[SchemaDict], settings: dict[str, object]) -> None:
-            sub_settings: SettingsType
+        stack: list[tuple[list[SchemaDict], SettingsType]] = [(self.schema, settings)]
+        while stack:
+            schema, node = stack.pop()
             for sub_schema in schema:
                 key = sub_schema["key"]
-                assert isinstance(sub_schema, dict)
                 type = sub_schema["type"]
 
                 if type == "object":
                     if fields := sub_schema.get("fields"):
-                        sub_settings = settings[key] = {}
-                        set_defaults(fields, sub_settings)
+                        sub_settings = node[key] = {}
+                        stack.append((fields, sub_settings))
 
                 else:
                     if (default := sub_schema.get("default")) is not None:
-                        settings[key] = default
+                        node[key] = default
 
-        set_defaults(self.schema, settings)
         return settings
 
     @cached_property
     def key_to_type(self) -> Mapping[str, type]:
         TYPE_MAP = {
-            "object": SchemaDict,
-            "string": str,
-            "integer": int,
-            "number": float,
-            "boolean": bool,
-            "choices": str,
-            "text": str,
+            SettingType.OBJECT: SchemaDict,
+            SettingType.STRING: str,
+            SettingType.INTEGER: int,
+            SettingType.NUMBER: float,
+            SettingType.BOOLEAN: bool,
+            SettingType.CHOICES: str,
+            SettingType.TEXT: str,
         }
 
-        def get_keys(setting: Setting) -> Iterable[tuple[str, type]]:
-            if setting.type == "object" and setting.children:
-                for child in setting.children.values():
-                    yield from get_keys(child)
+        keys: dict[str, type] = {}
+        # Reversed, so that keys are popped in schema order
+        stack = list(reversed(self.settings_map.values()))
+        while stack:
+            setting = stack.pop()
+            if setting.type == SettingType.OBJECT and setting.children:
+                stack.extend(reversed(setting.children.values()))
             else:
-                yield (setting.key, TYPE_MAP[setting.type])
-
-        keys = {
-            key: value_type
-            for setting in self.settings_map.values()
-            for key, value_type in get_keys(setting)
-        }
+                keys[setting.key] = TYPE_MAP[setting.type]
         return keys
 
     @property
@@ -186,44 +249,76 @@ class Schema:
         return self.key_to_type.keys()
 
     @cached_property
-    def settings_map(self) -> dict[str, Setting]:
-        form_settings: dict[str, Setting] = {}
+    def valid_keys(self) -> frozenset[str]:
+        """All keys in the schema (dot notation)."""
+        return frozenset(self.keys)
 
-        def build_settings(
-            name: str, schema: SchemaDict, default: object = None
+    @cached_property
+    def settings_map(self) -> dict[str, Setting]:
+        def build_setting(
+            name: str, schema: SchemaDict, children: dict[str, Setting] | None
         ) -> Setting:
-            schema_type = schema.get("type")
-            assert schema_type is not None
-            if schema_type == "object":
+            setting_type = SETTING_TYPES[schema["type"]]
+            if setting_type == SettingType.OBJECT:
                 return Setting(
                     name,
                     schema["title"],
-                    schema_type,
+                    setting_type,
                     help=schema.get("help") or "",
-                    default=schema.get("default", default),
+                    default=schema.get("default"),
                     validate=schema.get("validate"),
-                    children={
-                        schema["key"]: build_settings(f"{name}.{schema['key']}", schema)
-                        for schema in schema.get("fields", [])
-                    },
+                    children=children,
                     editable=schema.get("editable", True),
                 )
             else:
                 return Setting(
                     name,
                     schema["title"],
-                    schema_type,
+                    setting_type,
                     choices=schema.get("choices"),
                     help=schema.get("help") or "",
-                    default=schema.get("default", default),
+                    default=schema.get("default"),
                     validate=schema.get("validate"),
                     editable=schema.get("editable", True),
                 )
 
-        for sub_schema in self.schema:
-            form_settings[sub_schema["key"]] = build_settings(
-                sub_schema["key"], sub_schema
+        # Linearize the schema in pre-order, as (parent index, name, schema).
+        # Parents always come before their children, and the root is -1.
+        nodes: list[tuple[int, str, SchemaDict]] = []
+        stack = [(-1, sub_schema["key"], sub_schema) for sub_schema in self.schema]
+        stack.reverse()
+        while stack:
+            node = stack.pop()
+            _parent_index, name, schema = node
+            index = len(nodes)
+            nodes.append(node)
+            if schema.get("type") == "object":
+                stack.extend(
+                    (index, f"{name}.{field['key']}", field)
+                    for field in reversed(schema.get("fields", []))
+                )
+
+        # Build bottom-up, so each object is created with its completed children.
+        # Children are collected in reverse order, and flipped when the parent is built.
+        root: list[tuple[str, Setting]] = []
+        buffers: list[list[tuple[str, Setting]] | None] = [
+            [] if schema.get("type") == "object" else None for _, _, schema in nodes
+        ]
+        for index in range(len(nodes) - 1, -1, -1):
+            parent_index, name, schema = nodes[index]
+            buffer = buffers[index]
+            setting = build_setting(
+                name, schema, None if buffer is None else dict(reversed(buffer))
+            )
+            # Parents are always objects, so their buffer is never None
+            parent_buffer = (
+                root
+                if parent_index == -1
+                else cast(list[tuple[str, Setting]], buffers[parent_index])
             )
+            parent_buffer.append((schema["key"], setting))
+
+        form_settings: dict[str, Setting] = dict(reversed(root))
         return form_settings
 
 
@@ -238,8 +333,10 @@ class Settings:
     ) -> None:
         self._schema = schema
         self._settings = settings
+        self._flat = flatten_settings(settings)
         self._on_set_callback = on_set_callback
         self._changed: bool = False
+        self._expanded: dict[str, str] = {}
 
     @property
     def changed(self) -> bool:
@@ -264,6 +361,19 @@ class Settings:
             for key in self._schema.keys:
                 self._on_set_callback(key, self.get(key))
 
+    def _expand(self, value: str) -> str:
+        """Expand environment variables in a setting value (cached).
+
+        Args:
+            value: Raw value from settings.
+
+        Returns:
+            Value with environment variables expanded.
+        """
+        if (expanded := self._expanded.get(value)) is None:
+            expanded = self._expanded[value] = expandvars(value)
+        return expanded
+
     def get[ExpectType](
         self,
         key: str,
@@ -271,39 +381,24 @@ class Settings:
         *,
         expand: bool = True,
     ) -> ExpectType:
-        from os.path import expandvars
-
-        sub_settings = self._settings
-
-        for last, sub_key in loop_last(parse_key(key)):
-            if last:
-                if (value := sub_settings.get(sub_key)) is None:
-                    default = self._schema.get_default(key)
-                    if default is None:
-                        default = expect_type()
-                    if not isinstance(default, expect_type):
-                        default = expect_type(default)
-                    assert isinstance(default, expect_type)
-                    return default
-
-                if isinstance(value, str) and expand:
-                    value = expandvars(value)
-                if not isinstance(value, expect_type):
-                    value = expect_type(value)
-                if not isinstance(value, expect_type):
-                    raise InvalidValue(
-                        f"key {sub_key!r} is not of expected type {expect_type.__name__}"
-                    )
-                return value
-            if not isinstance((sub_settings := sub_settings.get(sub_key, {})), dict):
-                default = self._schema.get_default(key)
-                if default is None:
-                    default = expect_type()
-                if not isinstance(default, expect_type):
-                    default = expect_type(default)
-                assert isinstance(default, expect_type)
-                return default
-        assert False, "Can't get here"
+        if (value := self._flat.get(key)) is None:
+            default = self._schema.get_default(key)
+            if default is None:
+                default = expect_type()
+            if not isinstance(default, expect_type):
+                default = expect_type(default)
+            assert isinstance(default, expect_type)
+            return default
+
+        if isinstance(value, str) and expand:
+            value = self._expand(value)
+        if not isinstance(value, expect_type):
+            value = expect_type(value)
+        if not isinstance(value, expect_type):
+            raise InvalidValue(
+                f"key {key!r} is not of expected type {expect_type.__name__}"
+            )
+        return value
 
     def set(self, key: str, value: object) -> None:
         """Set a setting value.
@@ -317,13 +412,17 @@ class Settings:
         updated_settings = copy.deepcopy(self._settings)
 
         setting = updated_settings
-        for last, sub_key in loop_last(parse_key(key)):
-            if last:
+        sub_keys = parse_key(key)
+        last_index = len(sub_keys) - 1
+        for index, sub_key in enumerate(sub_keys):
+            if index == last_index:
+                assert isinstance(setting, dict)
+                setting[sub_key] = value
                 if current_value != value:
                     self._changed = True
                     self._settings = updated_settings
-                assert isinstance(setting, dict)
-                setting[sub_key] = value
+                    self._flat = flatten_settings(updated_settings)
+                    self._expanded.clear()
             else:
                 setting_node = setting.setdefault(sub_key, {})
                 if isinstance(setting_node, dict):
@@ -1,4 +1,4 @@
-from toad.settings import SchemaDict
+from toad.settings import Schema, SchemaDict
 
 SCHEMA: list[SchemaDict] = [
     {
@@ -344,3 +344,8 @@ SCHEMA: list[SchemaDict] = [
         ],
     },
 ]
+
+
+COMPILED_SCHEMA = Schema(SCHEMA)
+"""The app's settings schema, with derived data built at import time."""
+COMPILED_SCHEMA.precompute()
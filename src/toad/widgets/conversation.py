@@ -42,6 +42,7 @@ from toad.answer import Answer
 from toad.agent import AgentBase, AgentReady, AgentFail
 from toad.history import History
 from toad.widgets.flash import Flash
+from toad.widgets.lazy_compose import LazyVerticalScroll
 from toad.widgets.menu import Menu
 from toad.widgets.note import Note
 from toad.widgets.prompt import Prompt
@@ -161,7 +162,7 @@ class ContentsGrid(containers.Grid):
         layout.stretch_height = True
 
 
-class Window(containers.VerticalScroll):
+class Window(LazyVerticalScroll):
     BINDING_GROUP_TITLE = "View"
     BINDINGS = [Binding("end", "screen.focus_prompt", "Prompt")]
 
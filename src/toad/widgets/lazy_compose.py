@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from typing import Callable
+
+from textual import containers
+from textual.widget import Widget
+
+
+class LazyCompose:
+    """Mixin for conversation blocks which may release their content while out of view.
+
+    The blocks are managed by the nearest `LazyVerticalScroll` ancestor. While released,
+    the content widget is removed and the block's height is fixed at its last size, so
+    that the layout doesn't change.
+
+    Call `set_lazy_content` from the constructor, and yield `lazy_content` from compose.
+    List this mixin *after* the Widget base, so that CSS is inherited from the Widget.
+    """
+
+    _lazy_build: Callable[[], Widget]
+    _lazy_content: Widget | None = None
+    _lazy_owner: LazyVerticalScroll | None = None
+
+    def set_lazy_content(self, build_content: Callable[[], Widget]) -> None:
+        """Set a factory which builds the content, and build the initial content.
+
+        Args:
+            build_content: A callable that returns a new content widget.
+        """
+        self._lazy_build = build_content
+        self._lazy_content = build_content()
+
+    @property
+    def lazy_content(self) -> Widget:
+        """The current content widget."""
+        if self._lazy_content is None:
+            self._lazy_content = self._lazy_build()
+        return self._lazy_content
+
+    @property
+    def is_lazy_content_released(self) -> bool:
+        """Is the content currently released?"""
+        return self._lazy_content is None
+
+    def on_mount(self) -> None:
+        assert isinstance(self, Widget)
+        for ancestor in self.ancestors:
+            if isinstance(ancestor, LazyVerticalScroll):
+                self._lazy_owner = ancestor
+                ancestor.add_lazy_block(self)
+                break
+
+    def on_unmount(self) -> None:
+        if self._lazy_owner is not None:
+            self._lazy_owner.remove_lazy_block(self)
+            self._lazy_owner = None
+
+    async def release_lazy_content(self) -> None:
+        """Remove the content widget, keeping the current height."""
+        assert isinstance(self, Widget)
+        if (content := self._lazy_content) is None or not content.is_attached:
+            return
+        self.styles.height = self.outer_size.height
+        self._lazy_content = None
+        await content.remove()
+
+    async def restore_lazy_content(self) -> None:
+        """Rebuild and mount the content widget, if it was released."""
+        assert isinstance(self, Widget)
+        if self._lazy_content is not None:
+            return
+        await self.mount(self.lazy_content)
+        self.styles.height = None
+
+
+class LazyVerticalScroll(containers.VerticalScroll):
+    """A vertical scroll which releases the content of `LazyCompose` blocks far from the viewport.
+
+    A single update runs after a scroll or a layout refresh (however many are triggered),
+    which bisects the blocks to find those near the viewport, and only touches blocks
+    which change state.
+    """
+
+    LAZY_MARGIN = 1.0
+    """Distance from the viewport (in viewport heights) beyond which content is released."""
+
+    def __init__(self, *children: Widget, **kwargs) -> None:
+        self._lazy_blocks: list[LazyCompose] = []
+        """Managed blocks, sorted by vertical position."""
+        self._lazy_blocks_sorted = True
+        self._lazy_live: set[LazyCompose] = set()
+        """Blocks which currently have their content."""
+        self._lazy_update_pending = False
+        self._lazy_width: int | None = None
+        super().__init__(*children, **kwargs)
+
+    def on_mount(self) -> None:
+        self.watch(self, "scroll_y", self._schedule_lazy_update, init=False)
+        self.screen.screen_layout_refresh_signal.subscribe(
+            self, self._schedule_lazy_update
+        )
+
+    def add_lazy_block(self, block: LazyCompose) -> None:
+        """Start managing a block.
+
+        Args:
+            block: A block, which will have its content.
+        """
+        self._lazy_blocks.append(block)
+        self._lazy_blocks_sorted = False
+        self._lazy_live.add(block)
+
+    def remove_lazy_block(self, block: LazyCompose) -> None:
+        """Stop managing a block.
+
+        Args:
+            block: A previously added block.
+        """
+        self._lazy_live.discard(block)
+        try:
+            self._lazy_blocks.remove(block)
+        except ValueError:
+            pass
+
+    def _schedule_lazy_update(self, *_) -> None:
+        if not self._lazy_update_pending:
+            self._lazy_update_pending = True
+            self.call_after_refresh(self.update_lazy_blocks)
+
+    async def update_lazy_blocks(self) -> None:
+        """Release or restore block content, depending on the distance from the viewport."""
+        self._lazy_update_pending = False
+        if not self._lazy_blocks or not self.is_attached or not self.screen.is_active:
+            return
+        viewport = self.scrollable_content_region
+        if not viewport:
+            return
+
+        if self._lazy_width is not None and self._lazy_width != viewport.width:
+            # Pinned heights are stale at the new width, so restore everything
+            self._lazy_width = viewport.width
+            for block in self._lazy_blocks:
+                if block not in self._lazy_live:
+                    self._lazy_live.add(block)
+                    await block.restore_lazy_content()
+            return
+        self._lazy_width = viewport.width
+
+        if not self._lazy_blocks_sorted:
+            self._lazy_blocks.sort(key=lambda block: block.region.y)
+            self._lazy_blocks_sorted = True
+
+        margin = int(viewport.height * self.LAZY_MARGIN)
+        top = viewport.y - margin
+        bottom = viewport.bottom + margin
+        blocks = self._lazy_blocks
+        start = bisect_right(blocks, top, key=lambda block: block.region.bottom)
+        end = bisect_left(blocks, bottom, key=lambda block: block.region.y, lo=start)
+        in_range = set(blocks[start:end])
+
+        for block in self._lazy_live - in_range:
+            self._lazy_live.discard(block)
+            await block.release_lazy_content()
+        for block in in_range - self._lazy_live:
+            self._lazy_live.add(block)
+            await block.restore_lazy_content()
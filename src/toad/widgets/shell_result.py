@@ -1,8 +1,10 @@
 from __future__ import annotations
+from functools import lru_cache
 from typing import Iterable
 
 from textual.app import ComposeResult
 from textual import containers
+from textual.content import Content
 from textual.highlight import highlight
 from textual.widgets import Static
 
@@ -11,6 +13,19 @@ from toad.menus import MenuItem
 from toad.widgets.non_selectable_label import NonSelectableLabel
 
 
+@lru_cache(maxsize=512)
+def highlight_command(command: str) -> Content:
+    """Highlight a shell command (cached, as commands are often repeated).
+
+    Args:
+        command: Shell command.
+
+    Returns:
+        Highlighted command.
+    """
+    return highlight(command, language="sh")
+
+
 class ShellResult(containers.HorizontalGroup):
     def __init__(
         self,
@@ -22,11 +37,12 @@ class ShellResult(containers.HorizontalGroup):
         disabled: bool = False,
     ) -> None:
         self._command = command
+        self._highlighted_command = highlight_command(command)
         super().__init__(name=name, id=id, classes=classes, disabled=disabled)
 
     def compose(self) -> ComposeResult:
         yield NonSelectableLabel("$", id="prompt")
-        yield Static(highlight(self._command, language="sh"))
+        yield Static(self._highlighted_command)
 
     def get_block_menu(self) -> Iterable[MenuItem]:
         yield from ()
@@ -1,20 +1,24 @@
+from functools import partial
 from typing import Iterable
 from textual.app import ComposeResult
 from textual import containers
 from textual.widgets import Markdown
 
 from toad.menus import MenuItem
+from toad.widgets.lazy_compose import LazyCompose
 from toad.widgets.non_selectable_label import NonSelectableLabel
 
 
-class UserInput(containers.HorizontalGroup):
+class UserInput(containers.HorizontalGroup, LazyCompose):
     def __init__(self, content: str) -> None:
         super().__init__()
         self.content = content
+        # The Markdown is built once here, and only rebuilt after being released
+        self.set_lazy_content(partial(Markdown, content, id="content"))
 
     def compose(self) -> ComposeResult:
         yield NonSelectableLabel("❯", id="prompt")
-        yield Markdown(self.content, id="content")
+        yield self.lazy_content
 
     def get_block_menu(self) -> Iterable[MenuItem]:
         yield from ()
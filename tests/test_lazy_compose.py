@@ -0,0 +1,134 @@
+import asyncio
+
+from textual.app import App, ComposeResult
+
+from toad.widgets.lazy_compose import LazyVerticalScroll
+from toad.widgets.user_input import UserInput
+
+
+class CountingScroll(LazyVerticalScroll):
+    update_count = 0
+
+    async def update_lazy_blocks(self) -> None:
+        self.update_count += 1
+        await super().update_lazy_blocks()
+
+
+class LazyApp(App):
+    CSS = """
+    CountingScroll {
+        height: 10;
+    }
+    """
+
+    def __init__(self, prompts: list[str]) -> None:
+        self.prompts = prompts
+        super().__init__()
+
+    def compose(self) -> ComposeResult:
+        with CountingScroll():
+            for prompt in self.prompts:
+                yield UserInput(prompt)
+
+
+def test_release_and_restore() -> None:
+    """Content is released when scrolled out of view, and restored on scroll back."""
+
+    async def run() -> None:
+        app = LazyApp([f"Prompt {index}" for index in range(30)])
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            first = app.query(UserInput).first()
+            # The prompt sits beside the content
+            prompt, content = first.children
+            assert prompt.region.y == content.region.y
+            assert prompt.region.right <= content.region.x
+            height = first.outer_size.height
+
+            # Blocks far from the viewport are released
+            last = app.query(UserInput).last()
+            assert last.is_lazy_content_released
+            assert len(last.children) == 1
+
+            app.query_one(CountingScroll).scroll_end(animate=False)
+            await pilot.pause()
+            await pilot.pause()
+            assert first.is_lazy_content_released
+            assert len(first.children) == 1
+            assert first.outer_size.height == height
+            assert not last.is_lazy_content_released
+
+            app.query_one(CountingScroll).scroll_home(animate=False)
+            await pilot.pause()
+            await pilot.pause()
+            assert not first.is_lazy_content_released
+            assert len(first.children) == 2
+            assert first.outer_size.height == height
+
+    asyncio.run(run())
+
+
+def test_updates_are_coalesced() -> None:
+    """A scroll runs a single update, regardless of the number of blocks."""
+
+    async def run() -> None:
+        app = LazyApp([f"Prompt {index}" for index in range(200)])
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            scroll = app.query_one(CountingScroll)
+            scroll.update_count = 0
+            scroll.scroll_down(animate=False)
+            await pilot.pause()
+            assert 1 <= scroll.update_count <= 3
+
+    asyncio.run(run())
+
+
+def test_resize_restores_released_blocks() -> None:
+    """Pinned heights are dropped when the width changes."""
+
+    async def run() -> None:
+        prompt = " ".join(["word"] * 40)
+        app = LazyApp([prompt] * 30)
+        async with app.run_test(size=(100, 24)) as pilot:
+            await pilot.pause()
+            last = app.query(UserInput).last()
+            assert last.is_lazy_content_released
+            wide_height = last.outer_size.height
+
+            await pilot.resize_terminal(40, 24)
+            await pilot.pause()
+            await pilot.pause()
+            first = app.query(UserInput).first()
+            assert first.outer_size.height > wide_height
+            blocks = app.query(UserInput)
+            released = [block for block in blocks if block.is_lazy_content_released]
+            restored = [block for block in blocks if not block.is_lazy_content_released]
+            assert released
+            narrow_height = first.outer_size.height
+            assert all(block.outer_size.height == narrow_height for block in released)
+            assert all(block.outer_size.height == narrow_height for block in restored)
+
+    asyncio.run(run())
+
+
+def test_user_input_builds_markdown_once() -> None:
+    """The Markdown built in the constructor is the one that gets mounted."""
+
+    class UserInputApp(App):
+        def __init__(self, user_input: UserInput) -> None:
+            self.user_input = user_input
+            super().__init__()
+
+        def compose(self) -> ComposeResult:
+            yield self.user_input
+
+    async def run() -> None:
+        user_input = UserInput("Hello")
+        app = UserInputApp(user_input)
+        markdown = user_input.lazy_content
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            assert user_input.query_one("#content") is markdown
+
+    asyncio.run(run())